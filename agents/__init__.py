@@ -22,19 +22,33 @@ Agents:
 - Lender Agent ("Luna"): Creates offers, evaluates risk, signs settlements
 """
 
-from .borrower_agent import (
-    create_borrower_agent,
-    run_complete_workflow,
-    run_integrated_workflow,
-    LoanOffer,
-    HydraHeadManager,
-)
-from .lender_agent import (
-    create_lender_agent,
-    run_lender_agent,
-    handle_negotiation_request,
-    LendingPool,
-)
+import importlib
+
+# Exports are resolved on first access (PEP 562), so importing one submodule
+# (e.g. agents.lender_agent) doesn't also load the other agent and its
+# module-level setup
+_LAZY_EXPORTS = {
+    "create_borrower_agent": "borrower_agent",
+    "run_complete_workflow": "borrower_agent",
+    "run_integrated_workflow": "borrower_agent",
+    "LoanOffer": "borrower_agent",
+    "HydraHeadManager": "borrower_agent",
+    "create_lender_agent": "lender_agent",
+    "run_lender_agent": "lender_agent",
+    "handle_negotiation_request": "lender_agent",
+    "LendingPool": "lender_agent",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
 __all__ = [
     # Borrower Agent (Lenny)
     "create_borrower_agent",
@@ -74,7 +74,7 @@ def get_llm():
 # Data Classes
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CreditCheckResult:
     """Result from Midnight ZK credit check."""
     borrower_address: str
@@ -84,7 +84,7 @@ class CreditCheckResult:
     # Note: actual credit score is NEVER revealed (ZK magic!)
 
 
-@dataclass
+@dataclass(slots=True)
 class LoanOffer:
     """Loan offer from a lender."""
     lender_address: str
@@ -100,7 +100,7 @@ class LoanOffer:
             self.offer_id = f"offer_{int(time.time())}"
 
 
-@dataclass 
+@dataclass(slots=True)  # rates/status are updated as rounds progress
 class NegotiationState:
     """Tracks negotiation state in Hydra Head."""
     head_id: str
@@ -111,7 +111,7 @@ class NegotiationState:
     final_rate: Optional[float] = None
 
 
-@dataclass
+@dataclass(slots=True)  # status is updated after verification
 class SettlementTx:
     """Settlement transaction for Aiken Validator."""
     tx_hash: str
@@ -269,17 +269,18 @@ class HydraHeadManager:
         print(f"[Hydra] Rounds: {state.rounds}")
         print(f"[Hydra] Savings: {state.original_offer.interest_rate - state.final_rate}%")
         
-        # Generate settlement transaction
+        # Generate settlement transaction (one clock read for all ids)
+        now = int(time.time())
         settlement = SettlementTx(
-            tx_hash=f"tx_{head_id}_{int(time.time())}",
+            tx_hash=f"tx_{head_id}_{now}",
             head_id=head_id,
             borrower=borrower_address,
             lender=state.original_offer.lender_address,
             principal=state.original_offer.principal,
             final_rate_bps=int(state.final_rate * 100),
             term_months=state.original_offer.term_months,
-            borrower_signature=f"sig_borrower_{int(time.time())}",
-            lender_signature=f"sig_lender_{int(time.time())}"
+            borrower_signature=f"sig_borrower_{now}",
+            lender_signature=f"sig_lender_{now}"
         )
         
         print(f"\n[Hydra] Head closed. Settlement TX generated:")
@@ -40,7 +40,7 @@ def get_llm():
 # Data Classes
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class LendingPool:
     """Manages the lender's liquidity pool."""
     total_liquidity: float = 10000.0
@@ -60,7 +60,7 @@ class LendingPool:
         self.total_liquidity += profit
 
 
-@dataclass
+@dataclass(slots=True)
 class NegotiationRequest:
     """A negotiation request from a borrower."""
     borrower_address: str
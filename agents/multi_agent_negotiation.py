@@ -23,7 +23,7 @@ class NegotiationRole(Enum):
     MEDIATOR = "mediator"  # Optional AI mediator for complex negotiations
 
 
-@dataclass
+@dataclass(slots=True)
 class NegotiationParticipant:
     """Participant in multi-agent negotiation."""
     agent_id: str
@@ -32,13 +32,14 @@ class NegotiationParticipant:
     agent: Agent
     current_offer: Optional[Dict] = None
     negotiation_history: List[Dict] = None
+    crew: Optional[Crew] = None  # built on the participant's first turn
     
     def __post_init__(self):
         if self.negotiation_history is None:
             self.negotiation_history = []
 
 
-@dataclass
+@dataclass(slots=True)
 class MultiAgentNegotiation:
     """Multi-agent negotiation session."""
     negotiation_id: str
@@ -139,54 +140,15 @@ class MultiAgentNegotiationManager:
         negotiation.rounds += 1
         round_results = []
         
-        # Each participant makes an offer/counter-offer
+        # Participants respond to the same terms independently, so their
+        # agent calls run concurrently instead of one after another
+        await asyncio.gather(*(
+            self._participant_turn(negotiation, participant)
+            for participant in negotiation.participants
+        ))
+        
+        timestamp = datetime.now().isoformat()
         for participant in negotiation.participants:
-            if participant.role == NegotiationRole.BORROWER:
-                # Borrower analyzes and makes counter-offer
-                task = Task(
-                    description=(
-                        f"Analyze the current loan terms:\n"
-                        f"- Principal: {negotiation.loan_terms.get('principal', 0)}\n"
-                        f"- Interest Rate: {negotiation.loan_terms.get('interest_rate', 0)}%\n"
-                        f"- Term: {negotiation.loan_terms.get('term_months', 0)} months\n\n"
-                        f"Make a counter-offer if the terms are not favorable."
-                    ),
-                    expected_output="Counter-offer with reasoning",
-                    agent=participant.agent
-                )
-                
-                crew = Crew(agents=[participant.agent], tasks=[task], verbose=False)
-                result = crew.kickoff()
-                
-                # Parse result and update offer
-                # In production, this would parse the agent's response
-                participant.current_offer = {
-                    "interest_rate": negotiation.loan_terms.get("interest_rate", 0) - 0.5,
-                    "reasoning": str(result)
-                }
-                
-            elif participant.role == NegotiationRole.LENDER:
-                # Lender evaluates and responds
-                task = Task(
-                    description=(
-                        f"Evaluate the current negotiation:\n"
-                        f"- Current Rate: {negotiation.loan_terms.get('interest_rate', 0)}%\n"
-                        f"- Principal: {negotiation.loan_terms.get('principal', 0)}\n\n"
-                        f"Decide whether to accept, counter, or reject."
-                    ),
-                    expected_output="Decision with reasoning",
-                    agent=participant.agent
-                )
-                
-                crew = Crew(agents=[participant.agent], tasks=[task], verbose=False)
-                result = crew.kickoff()
-                
-                participant.current_offer = {
-                    "interest_rate": negotiation.loan_terms.get("interest_rate", 0),
-                    "decision": "counter",
-                    "reasoning": str(result)
-                }
-            
             round_results.append({
                 "participant": participant.agent_id,
                 "role": participant.role.value,
@@ -196,7 +158,7 @@ class MultiAgentNegotiationManager:
             participant.negotiation_history.append({
                 "round": negotiation.rounds,
                 "offer": participant.current_offer,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": timestamp
             })
         
         # Check for consensus
@@ -218,6 +180,84 @@ class MultiAgentNegotiationManager:
             "next_round": True
         }
     
+    async def _participant_turn(
+        self,
+        negotiation: MultiAgentNegotiation,
+        participant: NegotiationParticipant
+    ):
+        """
+        Let one participant respond to the current terms.
+        
+        Args:
+            negotiation: Negotiation session
+            participant: Participant whose turn it is
+        """
+        if participant.role not in (NegotiationRole.BORROWER, NegotiationRole.LENDER):
+            return
+        
+        terms = negotiation.loan_terms
+        result = await self._participant_crew(participant).kickoff_async(inputs={
+            "principal": terms.get("principal", 0),
+            "interest_rate": terms.get("interest_rate", 0),
+            "term_months": terms.get("term_months", 0)
+        })
+        
+        if participant.role == NegotiationRole.BORROWER:
+            # Parse result and update offer
+            # In production, this would parse the agent's response
+            participant.current_offer = {
+                "interest_rate": terms.get("interest_rate", 0) - 0.5,
+                "reasoning": str(result)
+            }
+        else:
+            participant.current_offer = {
+                "interest_rate": terms.get("interest_rate", 0),
+                "decision": "counter",
+                "reasoning": str(result)
+            }
+    
+    def _participant_crew(self, participant: NegotiationParticipant) -> Crew:
+        """
+        Get the participant's crew, building it on first use.
+        
+        The task descriptions are templates filled from kickoff inputs, so
+        the same crew serves every round.
+        
+        Args:
+            participant: Borrower or lender participant
+        
+        Returns:
+            Single-task crew for the participant's agent
+        """
+        if participant.crew is None:
+            if participant.role == NegotiationRole.BORROWER:
+                # Borrower analyzes and makes counter-offer
+                task = Task(
+                    description=(
+                        "Analyze the current loan terms:\n"
+                        "- Principal: {principal}\n"
+                        "- Interest Rate: {interest_rate}%\n"
+                        "- Term: {term_months} months\n\n"
+                        "Make a counter-offer if the terms are not favorable."
+                    ),
+                    expected_output="Counter-offer with reasoning",
+                    agent=participant.agent
+                )
+            else:
+                # Lender evaluates and responds
+                task = Task(
+                    description=(
+                        "Evaluate the current negotiation:\n"
+                        "- Current Rate: {interest_rate}%\n"
+                        "- Principal: {principal}\n\n"
+                        "Decide whether to accept, counter, or reject."
+                    ),
+                    expected_output="Decision with reasoning",
+                    agent=participant.agent
+                )
+            participant.crew = Crew(agents=[participant.agent], tasks=[task], verbose=False)
+        return participant.crew
+    
     def _check_consensus(self, negotiation: MultiAgentNegotiation) -> Dict[str, Any]:
         """Check if all participants have reached consensus."""
         borrower_offers = [
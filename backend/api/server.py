@@ -20,6 +20,12 @@ from datetime import datetime
 from pydantic import BaseModel
 from contextlib import asynccontextmanager
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Add project root to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../.."))
 
@@ -45,12 +51,28 @@ MIDNIGHT_AVAILABLE = False
 
 # Import Credit Oracle
 try:
-    from backend.oracles.credit_oracle import get_credit_oracle
+    from backend.oracles.credit_oracle import get_credit_oracle, close_credit_oracle
     ORACLE_AVAILABLE = True
 except ImportError as e:
     ORACLE_AVAILABLE = False
     print(f"[WARNING] Credit oracle not available: {e}")
 
+# Import ZK proof generator (for shutdown cleanup)
+try:
+    from backend.zk.proof_generator import close_proof_generator
+    ZK_AVAILABLE = True
+except ImportError as e:
+    ZK_AVAILABLE = False
+    print(f"[WARNING] ZK proof generator not available: {e}")
+
+# Import Ethereum contract client
+try:
+    from backend.ethereum.contract_client import get_contract_client
+    ETHEREUM_AVAILABLE = True
+except ImportError as e:
+    ETHEREUM_AVAILABLE = False
+    print(f"[WARNING] Ethereum contract client not available: {e}")
+
 
 # ============================================================================
 # Application Setup
@@ -78,6 +100,13 @@ async def lifespan(app: FastAPI):
     # Hydra removed - using Ethereum L2 instead
     app.state.hydra_manager = None
 
+    # Register deployed contracts once so request paths never (re)load ABIs
+    if ETHEREUM_AVAILABLE:
+        try:
+            get_contract_client().register_deployed_contracts()
+        except Exception as e:
+            print(f"[Ethereum] Contract registration failed: {e}")
+
     # Initialize AI Agents (always running)
     print("[Agents] Initializing AI agents...")
     app.state.agents_initialized = False
@@ -153,6 +182,14 @@ async def lifespan(app: FastAPI):
     if hasattr(app.state, 'agents_initialized') and app.state.agents_initialized:
         print("[Agents] Agents shutdown complete")
 
+    # Close the credit oracle's pooled HTTP client
+    if ORACLE_AVAILABLE:
+        await close_credit_oracle()
+
+    # Stop the ZK proof generator's batch proving pool
+    if ZK_AVAILABLE:
+        await asyncio.to_thread(close_proof_generator)
+
     # Hydra removed - no cleanup needed
 
 app = FastAPI(
@@ -237,6 +274,17 @@ class Trade(BaseModel):
 # WebSocket Manager
 # ============================================================================
 
+def _encode_message(message: dict) -> str:
+    """Serialize a websocket message once (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(message).decode()
+        except TypeError:
+            # orjson rejects integers wider than 64 bits (e.g. wei amounts)
+            pass
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
 class ConnectionManager:
     def __init__(self):
         self.connections: List[WebSocket] = []
@@ -257,14 +305,21 @@ class ConnectionManager:
         async with self._lock:
             connections_copy = self.connections.copy()
         
-        # Broadcast to all connections
-        dead_connections = []
-        for conn in connections_copy:
-            try:
-                await conn.send_json(message)
-            except Exception:
-                # Connection might be closed, mark for removal
-                dead_connections.append(conn)
+        # Encode once for all connections instead of per send_json call
+        payload = _encode_message(message)
+        
+        # Broadcast to all connections concurrently so one slow client
+        # doesn't hold up the rest
+        results = await asyncio.gather(
+            *(conn.send_text(payload) for conn in connections_copy),
+            return_exceptions=True
+        )
+        
+        # Connections that raised might be closed, mark for removal
+        dead_connections = [
+            conn for conn, result in zip(connections_copy, results)
+            if isinstance(result, Exception)
+        ]
         
         # Remove dead connections
         if dead_connections:
@@ -600,7 +655,7 @@ async def close_hydra_and_settle_real() -> Dict:
     if CARDANO_TX_AVAILABLE:
         try:
             tx_builder = get_tx_builder()
-            if tx_builder.available:
+            if await tx_builder.connect():
                 principal_lovelace = int(settlement["principal"] * 1_000_000)
                 interest_lovelace = int((settlement["principal"] * settlement["final_rate"] / 100) * 1_000_000)
                 
@@ -1246,8 +1301,8 @@ async def start_workflow(req: WorkflowRequest, background_tasks: BackgroundTasks
             auto_confirm=req.auto_confirm
         )
         
-        # Wait a bit for agent to start
-        await asyncio.sleep(2)
+        # Background tasks only start once this response has been sent, so
+        # there is nothing to wait for here
         
         # Determine target rate (simplified for now, agents will handle negotiation)
         if req.interest_rate <= 7.0:
@@ -1491,19 +1546,40 @@ async def agent_status():
     return agents_info
 
 
+# XAI decision log written by the agents' logging tools
+XAI_LOG_FILE = os.path.join(os.path.dirname(__file__), "../../logs/xai_decisions.jsonl")
+
+# Parsed XAI log, reused until the file's mtime or size changes
+_xai_log_cache: Dict[str, tuple] = {}
+
+
+def _read_xai_log(log_file: str) -> List[Dict]:
+    """Parse the XAI decision log, re-reading only when the file changed."""
+    try:
+        st = os.stat(log_file)
+    except OSError:
+        return []
+    
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _xai_log_cache.get(log_file)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    
+    logs = []
+    with open(log_file) as f:
+        for line in f:
+            try:
+                logs.append(json.loads(line))
+            except:
+                pass
+    _xai_log_cache[log_file] = (key, logs)
+    return logs
+
+
 @app.get("/api/agent/xai-logs")
 async def xai_logs(limit: int = 20):
     """Get XAI decision logs."""
-    log_file = os.path.join(os.path.dirname(__file__), "../../logs/xai_decisions.jsonl")
-    logs = []
-    if os.path.exists(log_file):
-        with open(log_file) as f:
-            for line in f:
-                try:
-                    logs.append(json.loads(line))
-                except:
-                    pass
-    return logs[-limit:]
+    return _read_xai_log(XAI_LOG_FILE)[-limit:]
 
 
 @app.get("/api/conversation/{conversation_id}")
@@ -1690,7 +1766,7 @@ async def websocket_endpoint(ws: WebSocket):
         
         while True:
             data = await ws.receive_text()
-            msg = json.loads(data)
+            msg = orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
             
             if msg.get("type") == "ping":
                 await ws.send_json({"type": "pong"})
@@ -1709,4 +1785,5 @@ if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", "8000"))
     host = os.getenv("HOST", "0.0.0.0")
-    uvicorn.run(app, host=host, port=port)
+    # Status frames are small JSON; permessage-deflate only costs CPU here
+    uvicorn.run(app, host=host, port=port, ws_per_message_deflate=False)
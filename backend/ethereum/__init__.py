@@ -3,10 +3,12 @@ Lendora AI - Ethereum Integration
 Ethereum L2 transaction builders and contract clients
 """
 
+from .provider import get_web3
 from .tx_builder import EthereumTxBuilder, get_tx_builder
 from .contract_client import EthereumContractClient, get_contract_client
 
 __all__ = [
+    "get_web3",
     "EthereumTxBuilder",
     "get_tx_builder",
     "EthereumContractClient",
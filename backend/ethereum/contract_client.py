@@ -4,25 +4,98 @@ Web3.py client for interacting with deployed contracts
 """
 
 import os
-from typing import Dict, Optional, Any, List
-from web3 import Web3
-from web3.contract import Contract
+import logging
+import threading
+from functools import lru_cache
+from typing import Dict, Optional, Any, List, NamedTuple, Tuple
+from web3 import AsyncWeb3, Web3
+from web3.contract import AsyncContract
+
+from .provider import get_web3
 
 try:
-    from web3 import Web3
-    from web3.contract import Contract
+    from web3 import AsyncWeb3, Web3
+    from web3.contract import AsyncContract
     WEB3_AVAILABLE = True
 except ImportError:
     WEB3_AVAILABLE = False
 
+logger = logging.getLogger(__name__)
+
+
+# Environment configuration (read once at import)
+_ETH_RPC_URL = os.getenv("ETH_RPC_URL", "https://goerli-rollup.arbitrum.io/rpc")
+_ETH_CHAIN_ID = int(os.getenv("ETH_CHAIN_ID", "421613"))  # Arbitrum Goerli
+
+
+@lru_cache(maxsize=1024)
+def _checksum(address: str) -> str:
+    """Memoized Web3.to_checksum_address (EIP-55 hashes the address each call)."""
+    return Web3.to_checksum_address(address)
+
+
+class Loan(NamedTuple):
+    """Loan summary returned by get_loan (use _asdict() if a dict is needed)."""
+    loanId: int
+    borrower: str
+    lender: str
+    principal: int
+    interestRate: int
+    termMonths: int
+    status: int
+
 
 class EthereumContractClient:
     """Client for interacting with Ethereum contracts."""
     
+    # LoanManager ABI (simplified - read functions used by this client)
+    LOAN_MANAGER_ABI = [
+        {
+            "inputs": [{"name": "loanId", "type": "uint256"}],
+            "name": "getLoan",
+            "outputs": [
+                {
+                    "components": [
+                        {"name": "borrower", "type": "address"},
+                        {"name": "lender", "type": "address"},
+                        {"name": "principal", "type": "uint256"},
+                        {"name": "interestRate", "type": "uint256"},
+                        {"name": "termMonths", "type": "uint256"},
+                        {"name": "collateralAmount", "type": "uint256"},
+                        {"name": "collateralToken", "type": "address"},
+                        {"name": "loanToken", "type": "address"},
+                        {"name": "createdAt", "type": "uint256"},
+                        {"name": "dueDate", "type": "uint256"},
+                        {"name": "repaidAt", "type": "uint256"},
+                        {"name": "status", "type": "uint8"},
+                        {"name": "zkProofHash", "type": "bytes32"},
+                        {"name": "creditEligible", "type": "bool"}
+                    ],
+                    "name": "",
+                    "type": "tuple"
+                }
+            ],
+            "stateMutability": "view",
+            "type": "function"
+        }
+    ]
+    
+    # CollateralVault ABI (simplified)
+    COLLATERAL_VAULT_ABI = [
+        {
+            "inputs": [{"name": "loanId", "type": "uint256"}],
+            "name": "getCollateralBalance",
+            "outputs": [{"name": "", "type": "uint256"}],
+            "stateMutability": "view",
+            "type": "function"
+        }
+    ]
+    
     def __init__(
         self,
         rpc_url: Optional[str] = None,
-        chain_id: int = 421613
+        chain_id: int = 421613,
+        w3: Optional["AsyncWeb3"] = None
     ):
         """
         Initialize contract client.
@@ -30,34 +103,55 @@ class EthereumContractClient:
         Args:
             rpc_url: Ethereum RPC URL
             chain_id: Chain ID
+            w3: AsyncWeb3 instance to use (defaults to the shared one for rpc_url)
         """
-        self.rpc_url = rpc_url or os.getenv("ETH_RPC_URL", "https://goerli-rollup.arbitrum.io/rpc")
+        self.rpc_url = rpc_url or _ETH_RPC_URL
         self.chain_id = chain_id
         
         if WEB3_AVAILABLE:
-            try:
-                self.w3 = Web3(Web3.HTTPProvider(self.rpc_url))
-                self._available = self.w3.is_connected()
-            except Exception:
-                self._available = False
-                self.w3 = None
+            self.w3 = w3 or get_web3(self.rpc_url)
         else:
-            self._available = False
             self.w3 = None
         
-        self.contracts: Dict[str, Contract] = {}
+        # Connection is checked lazily on first use (see connect())
+        self._available: Optional[bool] = None
+        
+        # Keyed by (contract name, checksum address); filled by register()
+        self.contracts: Dict[Tuple[str, str], AsyncContract] = {}
+        
+        # Pre-built function wrappers, keyed by (contract name, checksum address, function name)
+        self._fn: Dict[Tuple[str, str, str], Any] = {}
     
     @property
     def available(self) -> bool:
-        """Check if client is available."""
-        return WEB3_AVAILABLE and self._available
+        """
+        Check if client is available.
+        
+        False until connect() has been awaited; async callers should use
+        `await self.connect()` instead.
+        """
+        return WEB3_AVAILABLE and bool(self._available)
+    
+    async def connect(self) -> bool:
+        """
+        Check the RPC connection once and cache the result.
+        
+        Returns:
+            True if client is available and connected
+        """
+        if self._available is None and self.w3 is not None:
+            try:
+                self._available = await self.w3.is_connected()
+            except Exception:
+                self._available = False
+        return self.available
     
     def load_contract(
         self,
         contract_name: str,
         address: str,
         abi: List[Dict]
-    ) -> Optional[Contract]:
+    ) -> Optional[AsyncContract]:
         """
         Load a contract instance.
         
@@ -69,103 +163,133 @@ class EthereumContractClient:
         Returns:
             Contract instance
         """
-        if not self.available:
+        if self.w3 is None:
             return None
         
         try:
-            contract = self.w3.eth.contract(
-                address=Web3.to_checksum_address(address),
-                abi=abi
-            )
-            self.contracts[contract_name] = contract
+            checksum_address = _checksum(address)
+            contract = self.w3.eth.contract(address=checksum_address, abi=abi)
+            self.contracts[(contract_name, checksum_address)] = contract
+            
+            for entry in abi:
+                if entry.get("type") == "function":
+                    self._fn[(contract_name, checksum_address, entry["name"])] = (
+                        contract.get_function_by_name(entry["name"])
+                    )
             return contract
-        except Exception as e:
-            print(f"[ContractClient] Error loading contract {contract_name}: {e}")
+        except Exception:
+            logger.exception("Error loading contract %s", contract_name)
             return None
     
-    def get_loan(self, loan_manager_address: str, loan_id: int, abi: List[Dict]) -> Optional[Dict]:
+    def register(self, name: str, address: str, abi: List[Dict]) -> AsyncContract:
+        """
+        Register a contract once (at startup) for use by the read methods.
+        
+        Args:
+            name: Contract name ("LoanManager", "CollateralVault", ...)
+            address: Contract address
+            abi: Contract ABI
+        
+        Returns:
+            Contract instance
+        """
+        contract = self.load_contract(name, address, abi)
+        if contract is None:
+            raise RuntimeError(f"Could not register {name} at {address}")
+        return contract
+    
+    def register_deployed_contracts(self):
+        """Register contracts whose addresses are set in the environment."""
+        loan_manager_address = os.getenv("LOAN_MANAGER_ADDRESS")
+        if loan_manager_address:
+            self.register("LoanManager", loan_manager_address, self.LOAN_MANAGER_ABI)
+        
+        vault_address = os.getenv("COLLATERAL_VAULT_ADDRESS")
+        if vault_address:
+            self.register("CollateralVault", vault_address, self.COLLATERAL_VAULT_ABI)
+    
+    def _registered_function(self, name: str, address: str, fn_name: str):
+        """Look up a function of a registered contract (raises KeyError if not registered)."""
+        key = (name, _checksum(address), fn_name)
+        fn = self._fn.get(key)
+        if fn is None:
+            raise KeyError(f"{name} at {key[1]} is not registered; call register() at startup")
+        return fn
+    
+    async def get_loan(self, loan_manager_address: str, loan_id: int) -> Optional[Loan]:
         """
         Get loan details from LoanManager contract.
         
         Args:
-            loan_manager_address: LoanManager contract address
+            loan_manager_address: LoanManager contract address (must be registered)
             loan_id: Loan identifier
-            abi: Contract ABI
         
         Returns:
-            Loan data dictionary
+            Loan summary
         """
-        if not self.available:
+        if not await self.connect():
             return None
         
+        get_loan = self._registered_function("LoanManager", loan_manager_address, "getLoan")
+        
         try:
-            contract_name = f"LoanManager_{loan_manager_address}"
-            if contract_name not in self.contracts:
-                self.load_contract(contract_name, loan_manager_address, abi)
-            
-            contract = self.contracts[contract_name]
-            loan = contract.functions.getLoan(loan_id).call()
+            loan = await get_loan(loan_id).call()
             
-            # Convert to dictionary (structure depends on Loan struct)
-            return {
-                "loanId": loan_id,
-                "borrower": loan[0],
-                "lender": loan[1],
-                "principal": loan[2],
-                "interestRate": loan[3],
-                "termMonths": loan[4],
-                "status": loan[5]
-            }
+            # Fields 0-4 lead the Loan struct; status is field 11
+            return Loan(loan_id, *loan[:5], loan[11])
             
-        except Exception as e:
-            print(f"[ContractClient] Error getting loan: {e}")
+        except Exception:
+            logger.exception("Error getting loan %s", loan_id)
             return None
     
-    def get_collateral_balance(
+    async def get_collateral_balance(
         self,
         vault_address: str,
-        loan_id: int,
-        abi: List[Dict]
+        loan_id: int
     ) -> Optional[int]:
         """
         Get collateral balance for a loan.
         
         Args:
-            vault_address: CollateralVault contract address
+            vault_address: CollateralVault contract address (must be registered)
             loan_id: Loan identifier
-            abi: Contract ABI
         
         Returns:
             Collateral balance
         """
-        if not self.available:
+        if not await self.connect():
             return None
         
+        get_balance = self._registered_function("CollateralVault", vault_address, "getCollateralBalance")
+        
         try:
-            contract_name = f"CollateralVault_{vault_address}"
-            if contract_name not in self.contracts:
-                self.load_contract(contract_name, vault_address, abi)
-            
-            contract = self.contracts[contract_name]
-            balance = contract.functions.getCollateralBalance(loan_id).call()
+            balance = await get_balance(loan_id).call()
             
             return balance
             
-        except Exception as e:
-            print(f"[ContractClient] Error getting collateral: {e}")
+        except Exception:
+            logger.exception("Error getting collateral for loan %s", loan_id)
             return None
 
 
 # Global instance
 _contract_client: Optional[EthereumContractClient] = None
+_contract_client_lock = threading.Lock()
 
 
 def get_contract_client() -> EthereumContractClient:
     """Get or create global contract client instance."""
     global _contract_client
     if _contract_client is None:
-        rpc_url = os.getenv("ETH_RPC_URL", "https://goerli-rollup.arbitrum.io/rpc")
-        chain_id = int(os.getenv("ETH_CHAIN_ID", "421613"))
-        _contract_client = EthereumContractClient(rpc_url=rpc_url, chain_id=chain_id)
+        with _contract_client_lock:
+            if _contract_client is None:
+                _contract_client = EthereumContractClient(rpc_url=_ETH_RPC_URL, chain_id=_ETH_CHAIN_ID)
     return _contract_client
 
+
+def reset_contract_client():
+    """Drop the global contract client so the next get_contract_client() re-creates it."""
+    global _contract_client
+    with _contract_client_lock:
+        _contract_client = None
+
@@ -0,0 +1,29 @@
+"""
+Lendora AI - Ethereum Provider
+Shared AsyncWeb3 instance for the transaction builder and contract client
+"""
+
+from functools import lru_cache
+
+try:
+    from web3 import AsyncWeb3
+    WEB3_AVAILABLE = True
+except ImportError:
+    WEB3_AVAILABLE = False
+
+
+@lru_cache(maxsize=None)
+def get_web3(rpc_url: str) -> "AsyncWeb3":
+    """
+    Get the shared AsyncWeb3 instance for an RPC URL.
+    
+    Clients on the same URL share one provider, and with it one aiohttp
+    session and connection pool.
+    
+    Args:
+        rpc_url: Ethereum RPC URL
+    
+    Returns:
+        AsyncWeb3 instance
+    """
+    return AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(rpc_url))
@@ -3,24 +3,96 @@ Lendora AI - Ethereum Transaction Builder
 Replaces Cardano PyCardano transaction builder
 """
 
+import asyncio
+import logging
 import os
-from typing import Dict, Optional, Any, List
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Optional, Any, Sequence, Tuple
 from dataclasses import dataclass
-from web3 import Web3
+from web3 import AsyncWeb3, Web3
+from eth_abi import encode
 from eth_account import Account
+from web3.exceptions import TransactionNotFound
+
+from .provider import get_web3
 
 try:
-    from web3 import Web3
+    from web3 import AsyncWeb3, Web3
+    from eth_abi import encode
     from eth_account import Account
+    from web3.exceptions import TransactionNotFound
     WEB3_AVAILABLE = True
 except ImportError:
     WEB3_AVAILABLE = False
     print("[Ethereum] Warning: web3 not installed. Run: pip install web3 eth-account")
 
+logger = logging.getLogger(__name__)
+
+
+# Environment configuration (read once at import)
+_ETH_RPC_URL = os.getenv("ETH_RPC_URL", "https://goerli-rollup.arbitrum.io/rpc")
+_ETH_CHAIN_ID = int(os.getenv("ETH_CHAIN_ID", "421613"))  # Arbitrum Goerli
+_ETH_PRIVATE_KEY = os.getenv("ETH_PRIVATE_KEY")
+
+
+@lru_cache(maxsize=1024)
+def _checksum(address: str) -> str:
+    """Memoized Web3.to_checksum_address (EIP-55 hashes the address each call)."""
+    return Web3.to_checksum_address(address)
+
+
+# JSON-RPC error codes an endpoint returns when it does not accept batches
+_BATCH_REJECT_CODES = (-32600, -32601)  # invalid request, method not found
+
+
+def _batch_unsupported(exc: Exception) -> bool:
+    """True if exc means the provider/endpoint cannot do batches at all."""
+    if isinstance(exc, NotImplementedError):
+        return True
+    # web3 carries the JSON-RPC error object in args (and rpc_response on v7)
+    rpc_response = getattr(exc, "rpc_response", None)
+    errors = list(exc.args)
+    if isinstance(rpc_response, dict):
+        errors.append(rpc_response.get("error"))
+    return any(
+        isinstance(err, dict) and err.get("code") in _BATCH_REJECT_CODES
+        for err in errors
+    )
+
+
+# Native ETH collateral is passed to the contract as the zero address
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 
-@dataclass
+# LoanManager function selectors and argument types (computed once at import)
+CREATE_LOAN_TYPES = [
+    "address",    # lender
+    "uint256",    # principal
+    "uint256",    # interestRate
+    "uint256",    # termMonths
+    "address",    # collateralToken
+    "uint256",    # collateralAmount
+    "address",    # loanToken
+    "uint256[8]", # zkProof
+    "uint256[1]"  # publicSignals
+]
+CREATE_LOAN_SELECTOR = bytes(Web3.keccak(text=f"createLoan({','.join(CREATE_LOAN_TYPES)})")[:4])
+# zkProof/publicSignals are static arrays encoded in place, so they are appended pre-encoded
+CREATE_LOAN_HEAD_TYPES = CREATE_LOAN_TYPES[:7]
+REPAY_LOAN_SELECTOR = bytes(Web3.keccak(text="repayLoan(uint256)")[:4])
+
+
+def _pack_uint256(values: Sequence[int], length: int) -> bytes:
+    """ABI-encode a uint256[length] array (32-byte big-endian words)."""
+    if len(values) != length:
+        raise ValueError(f"Expected {length} uint256 values, got {len(values)}")
+    return b"".join(int(v).to_bytes(32, "big") for v in values)
+
+
+@dataclass(slots=True, frozen=True)
 class LoanSettlementParams:
-    """Parameters for loan settlement transaction."""
+    """Parameters for loan settlement transaction (immutable and hashable)."""
     borrower_address: str
     lender_address: str
     principal: int  # In token units (e.g., 1e6 for USDC)
@@ -30,18 +102,50 @@ class LoanSettlementParams:
     collateral_amount: int  # Collateral amount
     interest_rate: int  # In basis points
     term_months: int
-    zk_proof: List[int]  # ZK proof array [8 uint256 values]
-    public_signals: List[int]  # Public signals [1 uint256 value]
+    zk_proof: bytes  # ZK proof, 8 ABI-encoded uint256 values (256 bytes)
+    public_signals: bytes  # Public signals, 1 ABI-encoded uint256 value (32 bytes)
+    
+    def __post_init__(self):
+        if len(self.zk_proof) != 256 or len(self.public_signals) != 32:
+            raise ValueError("zk_proof/public_signals must be pre-encoded; use LoanSettlementParams.from_ints()")
+    
+    @classmethod
+    def from_ints(
+        cls,
+        zk_proof: Sequence[int],
+        public_signals: Sequence[int],
+        **fields
+    ) -> "LoanSettlementParams":
+        """
+        Build params from integer proof arrays, encoding them once.
+        
+        Args:
+            zk_proof: ZK proof array [8 uint256 values]
+            public_signals: Public signals [1 uint256 value]
+            **fields: Remaining LoanSettlementParams fields
+        
+        Returns:
+            Settlement parameters
+        """
+        return cls(
+            zk_proof=_pack_uint256(zk_proof, 8),
+            public_signals=_pack_uint256(public_signals, 1),
+            **fields
+        )
 
 
 class EthereumTxBuilder:
     """Builds Ethereum transactions using Web3.py."""
     
+    # Cached gas price lifetime in seconds (kept under one L2 block)
+    GAS_PRICE_TTL = 5.0
+    
     def __init__(
         self,
         rpc_url: Optional[str] = None,
         chain_id: int = 421613,  # Arbitrum Goerli testnet
-        private_key: Optional[str] = None
+        private_key: Optional[str] = None,
+        w3: Optional["AsyncWeb3"] = None
     ):
         """
         Initialize transaction builder.
@@ -50,24 +154,28 @@ class EthereumTxBuilder:
             rpc_url: Ethereum RPC URL (L2 recommended)
             chain_id: Chain ID (421613 = Arbitrum Goerli, 42161 = Arbitrum Mainnet)
             private_key: Private key for signing (optional, can sign later)
+            w3: AsyncWeb3 instance to use (defaults to the shared one for rpc_url)
         """
-        self.rpc_url = rpc_url or os.getenv("ETH_RPC_URL", "https://goerli-rollup.arbitrum.io/rpc")
+        self.rpc_url = rpc_url or _ETH_RPC_URL
         self.chain_id = chain_id
         
         if WEB3_AVAILABLE:
-            try:
-                self.w3 = Web3(Web3.HTTPProvider(self.rpc_url))
-                if not self.w3.is_connected():
-                    raise ConnectionError("Failed to connect to Ethereum RPC")
-                self._available = True
-            except Exception as e:
-                print(f"[Ethereum] Warning: Could not connect to RPC: {e}")
-                self._available = False
-                self.w3 = None
+            self.w3 = w3 or get_web3(self.rpc_url)
         else:
-            self._available = False
             self.w3 = None
         
+        # Connection is checked lazily on first use (see connect())
+        self._available: Optional[bool] = None
+        
+        # Local caches so back-to-back builds skip the nonce/gas price RPCs.
+        # Nonces are only cached for self.account, whose sends go through
+        # send_transaction; external senders sign and send elsewhere.
+        self._nonce_by_addr: Dict[str, int] = {}
+        self._gas_price_cache: Optional[Tuple[int, float]] = None
+        
+        # JSON-RPC batching needs web3 v7; disabled after the RPC rejects a batch
+        self._batch_supported = self.w3 is not None and hasattr(self.w3, "batch_requests")
+        
         if private_key:
             self.account = Account.from_key(private_key)
         else:
@@ -75,10 +183,103 @@ class EthereumTxBuilder:
     
     @property
     def available(self) -> bool:
-        """Check if Web3 is available and connected."""
-        return WEB3_AVAILABLE and self._available
+        """
+        Check if Web3 is available and connected.
+        
+        False until connect() has been awaited; async callers should use
+        `await self.connect()` instead.
+        """
+        return WEB3_AVAILABLE and bool(self._available)
     
-    def build_create_loan_tx(
+    async def connect(self) -> bool:
+        """
+        Check the RPC connection once and cache the result.
+        
+        Returns:
+            True if Web3 is available and connected
+        """
+        if self._available is None and self.w3 is not None:
+            try:
+                if not await self.w3.is_connected():
+                    raise ConnectionError("Failed to connect to Ethereum RPC")
+                self._available = True
+            except Exception as e:
+                print(f"[Ethereum] Warning: Could not connect to RPC: {e}")
+                self._available = False
+        return self.available
+    
+    def _caches_nonce(self, address: str) -> bool:
+        """Whether address is our own account (the only sender we track nonces for)."""
+        return self.account is not None and address == self.account.address
+    
+    async def _get_nonce(self, address: str) -> int:
+        """
+        Return the next nonce for address.
+        
+        Our own account's nonce is fetched on first use and advanced by
+        send_transaction; any other sender gets a fresh "pending" count.
+        """
+        nonce = self._nonce_by_addr.get(address)
+        if nonce is None:
+            nonce = await self.w3.eth.get_transaction_count(address, "pending")
+            if self._caches_nonce(address):
+                self._nonce_by_addr[address] = nonce
+        return nonce
+    
+    async def _get_gas_price(self) -> int:
+        """Return the network gas price, cached for GAS_PRICE_TTL seconds."""
+        now = time.monotonic()
+        cached = self._gas_price_cache
+        if cached is not None and now - cached[1] < self.GAS_PRICE_TTL:
+            return cached[0]
+        gas_price = await self.w3.eth.gas_price
+        self._gas_price_cache = (gas_price, now)
+        return gas_price
+    
+    async def _get_nonce_and_gas_price(self, address: str) -> Tuple[int, int]:
+        """
+        Return (nonce, gas price) for address.
+        
+        When neither value is cached both reads go out as a single JSON-RPC
+        batch; otherwise (or if batching is unsupported) they run concurrently.
+        """
+        cached = self._gas_price_cache
+        gas_price_fresh = cached is not None and time.monotonic() - cached[1] < self.GAS_PRICE_TTL
+        
+        if self._batch_supported and not gas_price_fresh and address not in self._nonce_by_addr:
+            try:
+                async with self.w3.batch_requests() as batch:
+                    batch.add(self.w3.eth.get_transaction_count(address, "pending"))
+                    batch.add(self.w3.eth.gas_price)
+                    nonce, gas_price = await batch.async_execute()
+                if self._caches_nonce(address):
+                    self._nonce_by_addr[address] = nonce
+                self._gas_price_cache = (gas_price, time.monotonic())
+                return nonce, gas_price
+            except Exception as e:
+                if _batch_unsupported(e):
+                    # Endpoint rejects batches outright - stop trying
+                    self._batch_supported = False
+                else:
+                    # Transient (throttling, timeout) - fall back for this call only
+                    logger.debug("Batched nonce/gas price read failed, falling back: %s", e)
+        
+        nonce, gas_price = await asyncio.gather(
+            self._get_nonce(address),
+            self._get_gas_price()
+        )
+        return nonce, gas_price
+    
+    def invalidate_nonce(self, address: str):
+        """
+        Drop the cached nonce for an address (e.g. after a dropped tx).
+        
+        Args:
+            address: Sender address
+        """
+        self._nonce_by_addr.pop(_checksum(address), None)
+    
+    async def build_create_loan_tx(
         self,
         loan_manager_address: str,
         params: LoanSettlementParams,
@@ -95,7 +296,7 @@ class EthereumTxBuilder:
         Returns:
             Dictionary with transaction data
         """
-        if not self.available:
+        if not await self.connect():
             return {
                 "success": False,
                 "error": "Web3 not available or not connected",
@@ -103,35 +304,35 @@ class EthereumTxBuilder:
             }
         
         try:
-            # Prepare function call data
-            # Function: createLoan(
-            #   address lender,
-            #   uint256 principal,
-            #   uint256 interestRate,
-            #   uint256 termMonths,
-            #   address collateralToken,
-            #   uint256 collateralAmount,
-            #   address loanToken,
-            #   uint256[8] calldata zkProof,
-            #   uint256[1] calldata publicSignals
-            # )
+            is_native_collateral = params.collateral_token == "0x0"
+            collateral_token = (
+                ZERO_ADDRESS if is_native_collateral
+                else _checksum(params.collateral_token)
+            )
             
-            function_signature = "createLoan(address,uint256,uint256,uint256,address,uint256,address,uint256[8],uint256[1])"
-            function_selector = self.w3.keccak(text=function_signature)[:4].hex()
+            encoded_args = encode(CREATE_LOAN_HEAD_TYPES, [
+                _checksum(params.lender_address),
+                params.principal,
+                params.interest_rate,
+                params.term_months,
+                collateral_token,
+                params.collateral_amount,
+                _checksum(params.loan_token)
+            ])
+            tx_data = "0x" + (
+                CREATE_LOAN_SELECTOR + encoded_args + params.zk_proof + params.public_signals
+            ).hex()
             
-            # Encode parameters (simplified - in production use Contract.encodeABI)
-            # For now, return the structure that frontend/backend can use
-            
-            # Get nonce
             if self.account:
-                nonce = self.w3.eth.get_transaction_count(self.account.address)
+                sender = self.account.address
             else:
-                nonce = self.w3.eth.get_transaction_count(Web3.to_checksum_address(params.borrower_address))
+                sender = _checksum(params.borrower_address)
             
-            # Get gas price
+            # Nonce and gas price are independent reads - fetch them in one round trip
             if gas_price is None:
-                gas_price = self.w3.eth.gas_price
+                nonce, gas_price = await self._get_nonce_and_gas_price(sender)
             else:
+                nonce = await self._get_nonce(sender)
                 gas_price = Web3.to_wei(gas_price, 'gwei')
             
             # Estimate gas (simplified)
@@ -139,14 +340,14 @@ class EthereumTxBuilder:
             
             # Build transaction
             tx_dict = {
-                "to": Web3.to_checksum_address(loan_manager_address),
-                "from": Web3.to_checksum_address(params.borrower_address),
+                "to": _checksum(loan_manager_address),
+                "from": _checksum(params.borrower_address),
                 "nonce": nonce,
                 "gasPrice": gas_price,
                 "gas": estimated_gas,
-                "value": params.collateral_amount if params.collateral_token == "0x0" else 0,
+                "value": params.collateral_amount if is_native_collateral else 0,
                 "chainId": self.chain_id,
-                "data": "0x" + function_selector  # Placeholder - actual encoding needed
+                "data": tx_data
             }
             
             return {
@@ -165,7 +366,7 @@ class EthereumTxBuilder:
                 "tx_data": None
             }
     
-    def build_repay_loan_tx(
+    async def build_repay_loan_tx(
         self,
         loan_manager_address: str,
         loan_id: int,
@@ -186,7 +387,7 @@ class EthereumTxBuilder:
         Returns:
             Dictionary with transaction data
         """
-        if not self.available:
+        if not await self.connect():
             return {
                 "success": False,
                 "error": "Web3 not available",
@@ -194,17 +395,9 @@ class EthereumTxBuilder:
             }
         
         try:
-            # Function: repayLoan(uint256 loanId)
-            function_signature = "repayLoan(uint256)"
-            function_selector = self.w3.keccak(text=function_signature)[:4].hex()
-            
-            # Encode loanId (simplified)
-            loan_id_encoded = self.w3.to_bytes(hexstr=hex(loan_id).replace('0x', '').zfill(64))
-            
-            tx_data = "0x" + function_selector + loan_id_encoded.hex()
+            tx_data = "0x" + (REPAY_LOAN_SELECTOR + encode(["uint256"], [loan_id])).hex()
             
             if self.account:
-                nonce = self.w3.eth.get_transaction_count(self.account.address)
                 from_address = self.account.address
             else:
                 # Will need borrower address
@@ -215,15 +408,16 @@ class EthereumTxBuilder:
                 }
             
             if gas_price is None:
-                gas_price = self.w3.eth.gas_price
+                nonce, gas_price = await self._get_nonce_and_gas_price(from_address)
             else:
+                nonce = await self._get_nonce(from_address)
                 gas_price = Web3.to_wei(gas_price, 'gwei')
             
             estimated_gas = 200000
             
             tx_dict = {
-                "to": Web3.to_checksum_address(loan_manager_address),
-                "from": Web3.to_checksum_address(from_address),
+                "to": _checksum(loan_manager_address),
+                "from": _checksum(from_address),
                 "nonce": nonce,
                 "gasPrice": gas_price,
                 "gas": estimated_gas,
@@ -247,7 +441,7 @@ class EthereumTxBuilder:
                 "tx_data": None
             }
     
-    def estimate_gas(self, tx_dict: Dict[str, Any]) -> Dict[str, Any]:
+    async def estimate_gas(self, tx_dict: Dict[str, Any]) -> Dict[str, Any]:
         """
         Estimate gas for a transaction.
         
@@ -257,7 +451,7 @@ class EthereumTxBuilder:
         Returns:
             Dictionary with gas estimate
         """
-        if not self.available:
+        if not await self.connect():
             return {
                 "success": False,
                 "gas_estimate": 0,
@@ -267,12 +461,15 @@ class EthereumTxBuilder:
         try:
             # Remove fields that estimation doesn't need
             estimate_tx = {k: v for k, v in tx_dict.items() if k not in ['gas', 'gasPrice']}
-            gas_estimate = self.w3.eth.estimate_gas(estimate_tx)
+            gas_estimate, gas_price = await asyncio.gather(
+                self.w3.eth.estimate_gas(estimate_tx),
+                self._get_gas_price()
+            )
             
             return {
                 "success": True,
                 "gas_estimate": gas_estimate,
-                "gas_estimate_gwei": Web3.from_wei(gas_estimate * self.w3.eth.gas_price, 'gwei')
+                "gas_estimate_gwei": Web3.from_wei(gas_estimate * gas_price, 'gwei')
             }
             
         except Exception as e:
@@ -293,7 +490,8 @@ class EthereumTxBuilder:
         Returns:
             Dictionary with signed transaction
         """
-        if not self.available:
+        # Signing is offline, so it only needs the libraries, not a connection
+        if not WEB3_AVAILABLE or self.w3 is None:
             return {
                 "success": False,
                 "error": "Web3 not available",
@@ -304,9 +502,14 @@ class EthereumTxBuilder:
             account = Account.from_key(private_key)
             signed_tx = account.sign_transaction(tx_dict)
             
+            # eth-account >= 0.13 renamed rawTransaction to raw_transaction
+            raw_tx = getattr(signed_tx, "raw_transaction", None)
+            if raw_tx is None:
+                raw_tx = signed_tx.rawTransaction
+            
             return {
                 "success": True,
-                "signed_tx": signed_tx.rawTransaction.hex(),
+                "signed_tx": raw_tx.hex(),
                 "tx_hash": signed_tx.hash.hex()
             }
             
@@ -317,17 +520,33 @@ class EthereumTxBuilder:
                 "signed_tx": None
             }
     
-    def send_transaction(self, signed_tx_hex: str) -> Dict[str, Any]:
+    def _tx_sender(self, signed_tx_hex: str, from_address: Optional[str] = None) -> Optional[str]:
+        """Best-effort sender of a signed transaction (checksummed)."""
+        try:
+            return Account.recover_transaction(signed_tx_hex)
+        except Exception:
+            pass
+        if from_address:
+            return _checksum(from_address)
+        return self.account.address if self.account else None
+    
+    async def send_transaction(
+        self,
+        signed_tx_hex: str,
+        from_address: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Send a signed transaction to the network.
         
         Args:
             signed_tx_hex: Signed transaction hex string
+            from_address: Sender address (defaults to the signer recovered from
+                the transaction, then to self.account)
         
         Returns:
             Dictionary with transaction hash
         """
-        if not self.available:
+        if not await self.connect():
             return {
                 "success": False,
                 "error": "Web3 not available",
@@ -335,7 +554,12 @@ class EthereumTxBuilder:
             }
         
         try:
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx_hex)
+            tx_hash = await self.w3.eth.send_raw_transaction(signed_tx_hex)
+            
+            # Advance our account's cached nonce if it sent this transaction
+            sender = self._tx_sender(signed_tx_hex, from_address)
+            if sender in self._nonce_by_addr:
+                self._nonce_by_addr[sender] += 1
             
             return {
                 "success": True,
@@ -350,25 +574,51 @@ class EthereumTxBuilder:
                 "tx_hash": None
             }
     
-    def wait_for_receipt(self, tx_hash: str, timeout: int = 120) -> Dict[str, Any]:
+    async def wait_for_receipt(
+        self,
+        tx_hash: str,
+        timeout: int = 120,
+        block_time: float = 2.0
+    ) -> Dict[str, Any]:
         """
         Wait for transaction receipt.
         
+        Polls the block number every max(1s, block_time / 2) and only asks for
+        the receipt once a new block has been produced.
+        
         Args:
             tx_hash: Transaction hash
             timeout: Timeout in seconds
+            block_time: Expected block time of the chain in seconds
         
         Returns:
             Transaction receipt
         """
-        if not self.available:
+        if not await self.connect():
             return {
                 "success": False,
                 "error": "Web3 not available"
             }
         
         try:
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            poll_latency = max(1.0, block_time / 2)
+            last_block = None
+            
+            while True:
+                block_number = await self.w3.eth.block_number
+                if block_number != last_block:
+                    last_block = block_number
+                    try:
+                        receipt = await self.w3.eth.get_transaction_receipt(tx_hash)
+                        break
+                    except TransactionNotFound:
+                        pass
+                
+                if loop.time() >= deadline:
+                    raise TimeoutError(f"Transaction {tx_hash} not mined after {timeout} seconds")
+                await asyncio.sleep(poll_latency)
             
             return {
                 "success": True,
@@ -390,15 +640,26 @@ class EthereumTxBuilder:
 
 # Global instance
 _tx_builder: Optional[EthereumTxBuilder] = None
+_tx_builder_lock = threading.Lock()
 
 
 def get_tx_builder() -> EthereumTxBuilder:
     """Get or create global transaction builder instance."""
     global _tx_builder
     if _tx_builder is None:
-        rpc_url = os.getenv("ETH_RPC_URL", "https://goerli-rollup.arbitrum.io/rpc")
-        chain_id = int(os.getenv("ETH_CHAIN_ID", "421613"))  # Arbitrum Goerli
-        private_key = os.getenv("ETH_PRIVATE_KEY")
-        _tx_builder = EthereumTxBuilder(rpc_url=rpc_url, chain_id=chain_id, private_key=private_key)
+        with _tx_builder_lock:
+            if _tx_builder is None:
+                _tx_builder = EthereumTxBuilder(
+                    rpc_url=_ETH_RPC_URL,
+                    chain_id=_ETH_CHAIN_ID,
+                    private_key=_ETH_PRIVATE_KEY
+                )
     return _tx_builder
 
+
+def reset_tx_builder():
+    """Drop the global transaction builder so the next get_tx_builder() re-creates it."""
+    global _tx_builder
+    with _tx_builder_lock:
+        _tx_builder = None
+
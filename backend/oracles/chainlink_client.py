@@ -4,19 +4,63 @@ Replaces Charli3 oracle for Ethereum stack
 """
 
 import os
-from typing import Dict, Optional
+import logging
+import time
+import threading
+from typing import Dict, Optional, List, Tuple
 from dataclasses import dataclass
-from datetime import datetime
 
 try:
     from web3 import Web3
+    from web3.contract import Contract
+    from eth_abi import decode
+    import requests
+    from requests.adapters import HTTPAdapter
     WEB3_AVAILABLE = True
 except ImportError:
     WEB3_AVAILABLE = False
     print("[Chainlink] Warning: web3 not installed. Run: pip install web3")
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+
+# Price feed selectors and return types (for Multicall3 batches)
+LATEST_ROUND_DATA_SELECTOR = bytes.fromhex("feaf968c")  # latestRoundData()
+DECIMALS_SELECTOR = bytes.fromhex("313ce567")  # decimals()
+ROUND_DATA_TYPES = ["uint80", "int256", "uint256", "uint256", "uint80"]
+
+# Powers of ten for USD scaling (covers every realistic token/feed decimals)
+_POW10 = [10**i for i in range(37)]
+
+
+def _pow10(n: int) -> int:
+    """10**n, from the table when 0 <= n <= 36."""
+    return _POW10[n] if 0 <= n < len(_POW10) else 10**n
+
+
+def _make_provider(rpc_url: str):
+    """
+    Pick a long-lived provider for the RPC URL.
+    
+    ws(s):// URLs get a persistent WebSocket, IPC socket paths an IPC provider,
+    and everything else HTTP over a pooled keep-alive session.
+    """
+    if rpc_url.startswith(("ws://", "wss://")):
+        # web3 v7 renamed the sync provider to LegacyWebSocketProvider
+        ws_provider = getattr(Web3, "LegacyWebSocketProvider", None) or Web3.WebsocketProvider
+        return ws_provider(rpc_url)
+    
+    if rpc_url.endswith(".ipc"):
+        return Web3.IPCProvider(rpc_url)
+    
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return Web3.HTTPProvider(rpc_url, session=session)
+
+
+@dataclass(slots=True, frozen=True)
 class PriceData:
     """Price data from Chainlink oracle."""
     price: int  # Price in USD (scaled by decimals)
@@ -53,6 +97,40 @@ class ChainlinkOracle:
         }
     ]
     
+    # Multicall3 (same address on Arbitrum and most EVM chains)
+    MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+    MULTICALL3_ABI = [
+        {
+            "inputs": [
+                {
+                    "components": [
+                        {"name": "target", "type": "address"},
+                        {"name": "allowFailure", "type": "bool"},
+                        {"name": "callData", "type": "bytes"}
+                    ],
+                    "name": "calls",
+                    "type": "tuple[]"
+                }
+            ],
+            "name": "aggregate3",
+            "outputs": [
+                {
+                    "components": [
+                        {"name": "success", "type": "bool"},
+                        {"name": "returnData", "type": "bytes"}
+                    ],
+                    "name": "returnData",
+                    "type": "tuple[]"
+                }
+            ],
+            "stateMutability": "payable",
+            "type": "function"
+        }
+    ]
+    
+    # Stablecoins are priced 1:1 USD
+    STABLECOINS = ("USDC", "USDT", "DAI")
+    
     # Common Chainlink price feeds (Arbitrum)
     PRICE_FEEDS = {
         "ETH": "0x639Fe6ab55C92174dC7ECF4e0c8D6A3E78C5C7F7",  # ETH/USD Arbitrum Mainnet
@@ -62,6 +140,24 @@ class ChainlinkOracle:
         "WETH": "0x639Fe6ab55C92174dC7ECF4e0c8D6A3E78C5C7F7",  # Same as ETH
     }
     
+    # Max age in seconds before a feed answer is rejected (feed heartbeat)
+    DEFAULT_HEARTBEAT = 3600
+    HEARTBEATS = {
+        "ETH": 3600,
+        "WETH": 3600,
+    }
+    
+    # L2 sequencer uptime feeds by chain ID; prices are rejected while the
+    # sequencer is down and for SEQUENCER_GRACE_PERIOD seconds after it recovers
+    SEQUENCER_UPTIME_FEEDS = {
+        42161: "0xFdB631F5EE196F0ed6FAa767959853A9F217697D",  # Arbitrum Mainnet
+    }
+    SEQUENCER_GRACE_PERIOD = 3600
+    
+    # Fetched prices are reused for this many seconds (one L1 block)
+    PRICE_TTL = 12.0
+    PRICE_CACHE_SIZE = 256
+    
     def __init__(self, rpc_url: Optional[str] = None, chain_id: int = 421613):
         """
         Initialize Chainlink oracle client.
@@ -75,7 +171,7 @@ class ChainlinkOracle:
         
         if WEB3_AVAILABLE:
             try:
-                self.w3 = Web3(Web3.HTTPProvider(self.rpc_url))
+                self.w3 = Web3(_make_provider(self.rpc_url))
                 self._available = self.w3.is_connected()
             except Exception:
                 self._available = False
@@ -83,12 +179,36 @@ class ChainlinkOracle:
         else:
             self._available = False
             self.w3 = None
+        
+        # Instance copy of the feed table with addresses checksummed once up front
+        self.PRICE_FEEDS = {
+            symbol: self._checksum(address) if address else None
+            for symbol, address in self.PRICE_FEEDS.items()
+        }
+        sequencer_feed = self.SEQUENCER_UPTIME_FEEDS.get(chain_id)
+        self._sequencer_feed = self._checksum(sequencer_feed) if sequencer_feed else None
+        
+        # Per-feed caches keyed by checksum address (decimals() never changes)
+        self._contracts: Dict[str, "Contract"] = {}
+        self._decimals: Dict[str, int] = {}
+        self._multicall: Optional["Contract"] = None
+        
+        self.heartbeats: Dict[str, int] = dict(self.HEARTBEATS)
+        
+        # (symbol, feed address) -> (price data, monotonic fetch time)
+        self._price_cache: Dict[Tuple[str, str], Tuple[PriceData, float]] = {}
+        self._stablecoin: Optional[Tuple[PriceData, float]] = None
     
     @property
     def available(self) -> bool:
         """Check if oracle is available."""
         return WEB3_AVAILABLE and self._available
     
+    @staticmethod
+    def _checksum(address: str) -> str:
+        """EIP-55 checksum an address (returned as-is without web3)."""
+        return Web3.to_checksum_address(address) if WEB3_AVAILABLE else address
+    
     def get_price(self, token_symbol: str, price_feed_address: Optional[str] = None) -> Optional[PriceData]:
         """
         Get token price from Chainlink oracle.
@@ -104,49 +224,232 @@ class ChainlinkOracle:
             return None
         
         # Stablecoins are 1:1 USD
-        if token_symbol in ["USDC", "USDT", "DAI"]:
-            return PriceData(
-                price=1e8,  # 1 USD scaled by 8 decimals
-                decimals=8,
-                updatedAt=int(datetime.now().timestamp()),
-                roundId=0,
-                source="chainlink-stablecoin"
-            )
+        if token_symbol in self.STABLECOINS:
+            return self._stablecoin_price()
         
-        # Get price feed address
-        feed_address = price_feed_address or self.PRICE_FEEDS.get(token_symbol)
-        if not feed_address:
-            print(f"[Chainlink] No price feed for {token_symbol}")
+        # Get price feed address (table entries are already checksummed)
+        if price_feed_address:
+            addr = self._checksum(price_feed_address)
+        else:
+            addr = self.PRICE_FEEDS.get(token_symbol)
+        if not addr:
+            logger.warning("No price feed for %s", token_symbol)
             return None
         
         try:
-            from web3.contract import Contract
-            contract = self.w3.eth.contract(
-                address=Web3.to_checksum_address(feed_address),
-                abi=self.PRICE_FEED_ABI
-            )
+            cached = self._cached_price(token_symbol, addr)
+            if cached is not None:
+                return cached
+            
+            if not self._sequencer_up():
+                logger.warning("Sequencer down, not pricing %s", token_symbol)
+                return None
+            
+            contract = self._feed_contract(addr)
             
             # Get latest round data
-            round_id, price, started_at, updated_at, answered_in_round = contract.functions.latestRoundData().call()
-            decimals = contract.functions.decimals().call()
+            round_data = contract.functions.latestRoundData().call()
             
-            # Check if price is stale (older than 1 hour)
-            current_time = int(datetime.now().timestamp())
-            if current_time - updated_at > 3600:
-                print(f"[Chainlink] Warning: Price data stale for {token_symbol}")
+            decimals = self._decimals.get(addr)
+            if decimals is None:
+                decimals = contract.functions.decimals().call()
+                self._decimals[addr] = decimals
             
-            return PriceData(
-                price=price,
-                decimals=decimals,
-                updatedAt=updated_at,
-                roundId=round_id,
-                source="chainlink"
-            )
+            price_data = self._to_price_data(token_symbol, round_data, decimals)
+            if price_data is not None:
+                self._store_price(token_symbol, addr, price_data)
+            return price_data
             
         except Exception as e:
-            print(f"[Chainlink] Error fetching price for {token_symbol}: {e}")
+            logger.warning("Error fetching price for %s: %s", token_symbol, e)
             return None
     
+    def get_prices(self, token_symbols: List[str]) -> Dict[str, Optional[PriceData]]:
+        """
+        Get prices for several tokens with a single Multicall3 eth_call.
+        
+        Args:
+            token_symbols: Token symbols (ETH, WETH, USDC, etc.)
+        
+        Returns:
+            Dictionary mapping symbols to price data (None if unavailable)
+        """
+        if not self.available:
+            return {symbol: None for symbol in token_symbols}
+        
+        prices: Dict[str, Optional[PriceData]] = {}
+        feeds: Dict[str, str] = {}
+        for symbol in token_symbols:
+            if symbol in self.STABLECOINS:
+                prices[symbol] = self._stablecoin_price()
+                continue
+            addr = self.PRICE_FEEDS.get(symbol)
+            if not addr:
+                logger.warning("No price feed for %s", symbol)
+                prices[symbol] = None
+                continue
+            cached = self._cached_price(symbol, addr)
+            if cached is not None:
+                prices[symbol] = cached
+            else:
+                feeds[symbol] = addr
+        
+        if feeds:
+            try:
+                sequencer_up = self._sequencer_up()
+            except Exception as e:
+                logger.warning("Error checking sequencer uptime: %s", e)
+                sequencer_up = False
+            
+            if sequencer_up:
+                self._fetch_feed_prices(feeds, prices)
+                for symbol, addr in feeds.items():
+                    if prices[symbol] is not None:
+                        self._store_price(symbol, addr, prices[symbol])
+            else:
+                logger.warning("Sequencer down, not pricing feeds")
+                prices.update((symbol, None) for symbol in feeds)
+        
+        return {symbol: prices[symbol] for symbol in token_symbols}
+    
+    def _fetch_feed_prices(self, feeds: Dict[str, str], prices: Dict[str, Optional[PriceData]]):
+        """
+        Fill prices for symbol -> feed address in one aggregate3 call.
+        
+        decimals() is only requested for feeds that have not been seen yet.
+        """
+        feed_addresses = list(dict.fromkeys(feeds.values()))
+        missing_decimals = [addr for addr in feed_addresses if addr not in self._decimals]
+        calls = [(addr, True, LATEST_ROUND_DATA_SELECTOR) for addr in feed_addresses]
+        calls += [(addr, True, DECIMALS_SELECTOR) for addr in missing_decimals]
+        
+        try:
+            if self._multicall is None:
+                self._multicall = self.w3.eth.contract(
+                    address=Web3.to_checksum_address(self.MULTICALL3_ADDRESS),
+                    abi=self.MULTICALL3_ABI
+                )
+            results = self._multicall.functions.aggregate3(calls).call()
+        except Exception as e:
+            logger.warning("Multicall failed, fetching feeds one by one: %s", e)
+            for symbol, addr in feeds.items():
+                prices[symbol] = self.get_price(symbol, addr)
+            return
+        
+        # Multicall3 reports success with empty returnData for addresses without
+        # code, so check the length and treat undecodable results as failures
+        for addr, (success, data) in zip(missing_decimals, results[len(feed_addresses):]):
+            if success and len(data) >= 32:
+                try:
+                    self._decimals[addr] = decode(["uint8"], data)[0]
+                except Exception:
+                    pass
+        
+        rounds = {}
+        for addr, (success, data) in zip(feed_addresses, results):
+            if success and len(data) >= 160:
+                try:
+                    rounds[addr] = decode(ROUND_DATA_TYPES, data)
+                except Exception:
+                    pass
+        
+        for symbol, addr in feeds.items():
+            if addr not in rounds or addr not in self._decimals:
+                logger.warning("Error fetching price for %s: feed call reverted", symbol)
+                prices[symbol] = None
+                continue
+            prices[symbol] = self._to_price_data(symbol, rounds[addr], self._decimals[addr])
+    
+    def _feed_contract(self, address: str) -> "Contract":
+        """Return the cached price feed contract for a checksum address."""
+        contract = self._contracts.get(address)
+        if contract is None:
+            contract = self.w3.eth.contract(address=address, abi=self.PRICE_FEED_ABI)
+            self._contracts[address] = contract
+        return contract
+    
+    def _sequencer_up(self) -> bool:
+        """
+        Check the L2 sequencer uptime feed (always True on chains without one).
+        
+        Returns:
+            True if the sequencer is up and past the grace period
+        """
+        if not self._sequencer_feed:
+            return True
+        
+        contract = self._feed_contract(self._sequencer_feed)
+        _, answer, started_at, _, _ = contract.functions.latestRoundData().call()
+        
+        # answer: 0 = up, 1 = down; startedAt is when the status last changed
+        current_time = int(time.time())
+        return answer == 0 and current_time - started_at > self.SEQUENCER_GRACE_PERIOD
+    
+    def _to_price_data(self, token_symbol: str, round_data, decimals: int) -> Optional[PriceData]:
+        """
+        Validate latestRoundData() output and convert it to PriceData.
+        
+        Args:
+            token_symbol: Token symbol
+            round_data: (roundId, answer, startedAt, updatedAt, answeredInRound)
+            decimals: Feed decimals
+        
+        Returns:
+            Price data, or None if the answer is invalid or stale
+        """
+        round_id, price, started_at, updated_at, answered_in_round = round_data
+        
+        # Reject non-positive answers, incomplete rounds and answers older than the heartbeat
+        current_time = int(time.time())
+        heartbeat = self.heartbeats.get(token_symbol, self.DEFAULT_HEARTBEAT)
+        if (
+            price <= 0 or
+            answered_in_round < round_id or
+            updated_at == 0 or
+            current_time - updated_at > heartbeat
+        ):
+            logger.warning("Rejected stale or invalid price for %s", token_symbol)
+            return None
+        
+        return PriceData(
+            price=price,
+            decimals=decimals,
+            updatedAt=updated_at,
+            roundId=round_id,
+            source="chainlink"
+        )
+    
+    def _cached_price(self, token_symbol: str, feed_address: str) -> Optional[PriceData]:
+        """Return a cached price younger than PRICE_TTL, if any."""
+        cached = self._price_cache.get((token_symbol, feed_address))
+        if cached is not None and time.monotonic() - cached[1] < self.PRICE_TTL:
+            return cached[0]
+        return None
+    
+    def _store_price(self, token_symbol: str, feed_address: str, price_data: PriceData):
+        """Cache a fetched price, dropping expired entries when the cache is full."""
+        now = time.monotonic()
+        if len(self._price_cache) >= self.PRICE_CACHE_SIZE:
+            self._price_cache = {
+                key: entry for key, entry in self._price_cache.items()
+                if now - entry[1] < self.PRICE_TTL
+            }
+        self._price_cache[(token_symbol, feed_address)] = (price_data, now)
+    
+    def _stablecoin_price(self) -> PriceData:
+        """Return the fixed 1 USD price used for stablecoins (rebuilt every PRICE_TTL)."""
+        now = time.monotonic()
+        if self._stablecoin is None or now - self._stablecoin[1] >= self.PRICE_TTL:
+            price_data = PriceData(
+                price=10**8,  # 1 USD scaled by 8 decimals
+                decimals=8,
+                updatedAt=int(time.time()),
+                roundId=0,
+                source="chainlink-stablecoin"
+            )
+            self._stablecoin = (price_data, now)
+        return self._stablecoin[0]
+    
     def get_price_usd(self, token_symbol: str, amount: int, token_decimals: int = 18) -> Optional[int]:
         """
         Get USD value of a token amount.
@@ -165,31 +468,68 @@ class ChainlinkOracle:
         
         # Calculate: (amount * price) / (10^token_decimals * 10^price_decimals)
         # Return value in 1e18 scale
-        usd_value = (amount * price_data.price * (10**(18 - price_data.decimals))) // (10**token_decimals)
+        scale = 18 - price_data.decimals
+        if scale >= 0:
+            usd_value = (amount * price_data.price * _pow10(scale)) // _pow10(token_decimals)
+        else:
+            # Feeds with more than 18 decimals scale down instead of up
+            usd_value = (amount * price_data.price) // (_pow10(-scale) * _pow10(token_decimals))
         
         return usd_value
     
-    def set_price_feed(self, token_symbol: str, price_feed_address: str):
+    def get_price_bps(self, token_symbol: str) -> Optional[int]:
+        """
+        Get token price in basis points of a dollar (1 USD = 10000).
+        
+        Fits in 64 bits for any realistic price, so callers can store it in
+        int64 columns or do fixed-point math without big-integer scaling.
+        
+        Args:
+            token_symbol: Token symbol
+        
+        Returns:
+            Price in 1e-4 USD units (truncated)
+        """
+        price_data = self.get_price(token_symbol)
+        if not price_data:
+            return None
+        
+        if price_data.decimals >= 4:
+            return price_data.price // _pow10(price_data.decimals - 4)
+        return price_data.price * _pow10(4 - price_data.decimals)
+    
+    def set_price_feed(
+        self,
+        token_symbol: str,
+        price_feed_address: str,
+        heartbeat: Optional[int] = None
+    ):
         """
         Set custom price feed address for a token.
         
         Args:
             token_symbol: Token symbol
             price_feed_address: Chainlink price feed address
+            heartbeat: Max answer age in seconds (defaults to DEFAULT_HEARTBEAT)
         """
-        self.PRICE_FEEDS[token_symbol] = price_feed_address
+        self.PRICE_FEEDS[token_symbol] = self._checksum(price_feed_address)
+        if heartbeat is not None:
+            self.heartbeats[token_symbol] = heartbeat
 
 
 # Global instance
 _chainlink_oracle: Optional[ChainlinkOracle] = None
+_chainlink_oracle_lock = threading.Lock()
 
 
 def get_chainlink_oracle() -> ChainlinkOracle:
     """Get or create global Chainlink oracle instance."""
     global _chainlink_oracle
     if _chainlink_oracle is None:
-        rpc_url = os.getenv("ETH_RPC_URL", "https://goerli-rollup.arbitrum.io/rpc")
-        chain_id = int(os.getenv("ETH_CHAIN_ID", "421613"))
-        _chainlink_oracle = ChainlinkOracle(rpc_url=rpc_url, chain_id=chain_id)
+        with _chainlink_oracle_lock:
+            if _chainlink_oracle is None:
+                rpc_url = os.getenv("ETH_RPC_URL", "https://goerli-rollup.arbitrum.io/rpc")
+                chain_id = int(os.getenv("ETH_CHAIN_ID", "421613"))
+                _chainlink_oracle = ChainlinkOracle(rpc_url=rpc_url, chain_id=chain_id)
     return _chainlink_oracle
 
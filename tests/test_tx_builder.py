@@ -0,0 +1,42 @@
+"""
+Lendora AI - Transaction Builder Tests
+Offline checks for EthereumTxBuilder (no RPC node required)
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("web3")
+pytest.importorskip("eth_account")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from eth_account import Account
+
+from backend.ethereum.tx_builder import EthereumTxBuilder
+
+# Well-known throwaway key (Hardhat account #0) - never holds real funds
+TEST_PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+
+
+def test_sign_transaction_with_new_builder():
+    """Signing is offline and must work before connect() has been awaited."""
+    # Nothing listens on this port; signing must not need the RPC
+    builder = EthereumTxBuilder(rpc_url="http://127.0.0.1:1", chain_id=421613)
+    account = Account.from_key(TEST_PRIVATE_KEY)
+    
+    tx_dict = {
+        "to": account.address,
+        "value": 0,
+        "gas": 21000,
+        "gasPrice": 10**8,
+        "nonce": 0,
+        "chainId": 421613
+    }
+    
+    result = builder.sign_transaction(tx_dict, TEST_PRIVATE_KEY)
+    
+    assert result["success"], result.get("error")
+    assert Account.recover_transaction(result["signed_tx"]) == account.address